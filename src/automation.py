@@ -1,9 +1,18 @@
 #!/usr/bin/env python3
 
-import argparse, asyncio, json, os, platform, re, shutil, tempfile
+import argparse, asyncio, errno, json, os, platform, re, shutil, tempfile, time
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from playwright._impl._errors import TargetClosedError as PlaywrightTargetClosedError, Error as PlaywrightError
 
+def new_event_loop(): # use uvloop if installed, optional, faster event loop
+	if platform.system().lower() != "windows":
+		try:
+			import uvloop
+			return uvloop.new_event_loop()
+		except ImportError:
+			pass
+	return asyncio.new_event_loop()
+
 # ----------------------------------------
 
 def print_info(text):
@@ -24,14 +33,15 @@ def print_error(text):
 # ----------------------------------------
 
 def unique(sequence, sort = False): # unique sort
-	seen = set()
-	array = [x for x in sequence if not (x in seen or seen.add(x))]
+	array = list(dict.fromkeys(sequence)) # preserves the insertion order
 	if sort and array:
-		array = sorted(array, key = str.casefold, reverse = False) # sort by name ascending
+		array.sort(key = str.casefold, reverse = False) # sort by name ascending
 	return array
 
-def read_array(file, sort = False):
-	array = []
+READ_BUFFER_SIZE = 1024 * 1024 # 1 MiB, fewer "read()" calls for large files such as wordlists
+
+def file_is_readable(file):
+	success = False
 	if not os.path.isfile(file):
 		print_error(f"\"{file}\" is not a file or does not exist")
 	elif not os.access(file, os.R_OK):
@@ -39,12 +49,18 @@ def read_array(file, sort = False):
 	elif not os.stat(file).st_size > 0:
 		print_error(f"\"{file}\" file is empty")
 	else:
-		with open(file, "r", encoding = "UTF-8") as stream:
+		success = True
+	return success
+
+def read_generator(file): # unique lines, read lazily
+	if file_is_readable(file):
+		seen = set()
+		with open(file, "r", encoding = "UTF-8", buffering = READ_BUFFER_SIZE) as stream:
 			for line in stream:
 				line = line.strip()
-				if line:
-					array.append(line)
-	return unique(array, sort)
+				if line and line not in seen:
+					seen.add(line)
+					yield line
 
 def file_remove(file):
 	success = True
@@ -60,6 +76,45 @@ def file_remove(file):
 				print_error(f"Cannot remove \"{file}\" file")
 	return success
 
+COPY_BUFFER_SIZE = 1024 * 1024 # 1 MiB
+
+COPY_FALLBACK_ERRORS = [errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM] # kernel-side copying is not supported, fall back to the next method
+
+def file_copy_fast(source, destination): # try kernel-side copying first, then fall back to a large buffer copying
+	with open(source, "rb") as stream_in, open(destination, "wb") as stream_out:
+		fd_in, fd_out = stream_in.fileno(), stream_out.fileno()
+		copied = 0
+		if hasattr(os, "copy_file_range"): # linux 4.5+, also allows reflinks and server-side copying
+			try:
+				while True:
+					count = os.copy_file_range(fd_in, fd_out, 2 ** 30)
+					if not count:
+						if copied:
+							return
+						break # nothing copied, e.g. procfs or some fuse and overlay mounts, try the next method
+					copied += count
+			except OSError as ex:
+				if copied or ex.errno not in COPY_FALLBACK_ERRORS:
+					raise
+		if hasattr(os, "sendfile") and platform.system().lower() == "linux": # on other systems the destination must be a socket
+			try:
+				while True:
+					count = os.sendfile(fd_out, fd_in, copied, 2 ** 30)
+					if not count:
+						if copied:
+							return
+						break # nothing copied, e.g. procfs or some fuse and overlay mounts, try the next method
+					copied += count
+			except OSError as ex:
+				if copied or ex.errno not in COPY_FALLBACK_ERRORS:
+					raise
+		buffer = memoryview(bytearray(COPY_BUFFER_SIZE))
+		while True:
+			count = stream_in.readinto(buffer)
+			if not count:
+				break
+			stream_out.write(buffer[:count])
+
 def file_copy(source, destination):
 	success = True
 	if not os.path.isfile(source):
@@ -71,13 +126,16 @@ def file_copy(source, destination):
 			print_error(f"Destination \"{destination}\" is not a file")
 		else:
 			confirm = print_action(f"Destination \"{destination}\" file already exists, overwrite (yes): ").lower()
-			success = file_remove(destination) if confirm in ["yes", "y"] else False
+			success = confirm in ["yes", "y"]
 	if success:
+		tmp = f"{destination}.tmp.{os.getpid()}"
 		try:
-			shutil.copyfile(source, destination)
+			file_copy_fast(source, tmp)
+			os.replace(tmp, destination) # atomic swap, the destination is never missing
 		except Exception:
 			success = False
 			print_error(f"Cannot copy \"{source}\" file to \"{destination}\" file")
+			file_remove(tmp)
 	return success
 
 def directory_remove(directory):
@@ -107,6 +165,15 @@ def directory_create(directory):
 def directory_create_tmp():
 	return tempfile.mkdtemp(prefix = "automation_", suffix = "_session", dir = os.getcwd()) # create a new random directory in the current working directory and return its absolute path
 
+def directory_copy_fast(source, destination): # use the cached directory entry types instead of calling "os.stat()" for each entry
+	os.makedirs(destination)
+	with os.scandir(source) as entries:
+		for entry in entries:
+			if entry.is_dir():
+				directory_copy_fast(entry.path, os.path.join(destination, entry.name))
+			else:
+				file_copy_fast(entry.path, os.path.join(destination, entry.name))
+
 def directory_copy(source, destination):
 	success = True
 	if not os.path.isdir(source):
@@ -118,21 +185,39 @@ def directory_copy(source, destination):
 			print_error(f"Destination \"{destination}\" is not a directory")
 		else:
 			confirm = print_action(f"Destination \"{destination}\" directory already exists, overwrite (yes): ").lower()
-			success = directory_remove(destination) if confirm in ["yes", "y"] else False
+			success = confirm in ["yes", "y"]
 	if success:
+		tmp = f"{destination}.tmp.{os.getpid()}"
+		old = f"{destination}.old.{os.getpid()}"
 		try:
-			shutil.copytree(source, destination)
+			directory_copy_fast(source, tmp)
+			if os.path.exists(destination): # swap the directories, the destination is missing only between the two renames
+				os.rename(destination, old)
+				try:
+					os.rename(tmp, destination)
+				except Exception:
+					os.rename(old, destination) # restore the original directory
+					raise
+				shutil.rmtree(old, ignore_errors = True)
+			else:
+				os.rename(tmp, destination)
 		except Exception:
 			success = False
 			print_error(f"Cannot copy \"{source}\" directory to \"{destination}\" directory")
+			shutil.rmtree(tmp, ignore_errors = True)
 	return success
 
+def directory_has_file_casefold(directory, name): # case-insensitive file lookup
+	name = name.casefold()
+	with os.scandir(directory) as entries:
+		return any(entry.name.casefold() == name and entry.is_file() for entry in entries)
+
 def directory_has_manifest(directory):
 	success = True
 	if not os.path.isdir(directory):
 		success = False
 		print_error(f"\"{directory}\" is not a directory or does not exist")
-	elif "manifest.json" not in [file.lower() for file in os.listdir(directory)]:
+	elif not os.path.isfile(os.path.join(directory, "manifest.json")) and not directory_has_file_casefold(directory, "manifest.json"):
 		success = False
 		print_error(f"\"manifest.json\" file was not found in \"{directory}\" directory")
 	return success
@@ -142,13 +227,12 @@ def directory_get_chromium_extension(directory):
 	if not os.path.isdir(directory):
 		print_error(f"\"{directory}\" is not a directory or does not exist")
 	else:
-		directories = sorted(os.listdir(directory), key = str.casefold, reverse = True) # sort by name descending
-		if not directories:
+		with os.scandir(directory) as entries:
+			latest = max((entry for entry in entries if entry.is_dir()), key = lambda entry: entry.name.casefold(), default = None) # latest version by name
+		if not latest:
 			print_error(f"\"{directory}\" directory is empty")
-		else:
-			directory = os.path.join(directory, directories[0])
-			if directory_has_manifest(directory):
-				extension = directory
+		elif directory_has_manifest(latest.path):
+			extension = latest.path
 	return extension
 
 def directory_get_firefox_extension(directory, identifier): # playwright does not actually support firefox extensions
@@ -156,37 +240,34 @@ def directory_get_firefox_extension(directory, identifier): # playwright does no
 	if not os.path.isdir(directory):
 		print_error(f"\"{directory}\" is not a directory or does not exist")
 	else:
-		directories = sorted(os.listdir(directory), key = str.casefold, reverse = True) # sort by name descending
-		directories = [directory for directory in directories if directory.endswith(".default-release")]
-		if not directories:
+		with os.scandir(directory) as entries:
+			latest = max((entry for entry in entries if entry.name.endswith(".default-release") and entry.is_dir()), key = lambda entry: entry.name.casefold(), default = None)
+		if not latest:
 			print_error(f"No \"*.default-release\" directory was found in \"{directory}\" directory")
 		else:
-			file = os.path.join(directory, directories[0], "extensions", identifier)
+			file = os.path.join(latest.path, "extensions", identifier)
 			if not os.path.isfile(file):
 				print_error(f"\"{file}\" is not a file or does not exist")
 			else:
 				extension = file
 	return extension
 
+EXTENSION_PATHS = {
+	("darwin", "chromium") : ("Library", "Application Support", "Google", "Chrome", "Default", "Extensions"),
+	("darwin", "firefox")  : ("Library", "Application Support", "Firefox", "Profiles"),
+	("windows", "chromium"): ("AppData", "Local", "Google", "Chrome", "User Data", "Default", "Extensions"),
+	("windows", "firefox") : None,
+	("linux", "chromium")  : (".config", "google-chrome", "Default", "Extensions"),
+	("linux", "firefox")   : None
+} # relative to the user's home directory
+
 def directory_get_browser_extension(browser, identifier):
 	extension = ""
-	system = platform.system().lower()
-	user = os.path.expanduser("~")
-	context = {
-		"darwin" : {
-			"chromium": os.path.join(user, "Library", "Application Support", "Google", "Chrome", "Default", "Extensions", identifier),
-			"firefox" : os.path.join(user, "Library", "Application Support", "Firefox", "Profiles")
-		},
-		"windows" : {
-			"chromium": os.path.join(user, "AppData", "Local", "Google", "Chrome", "User Data", "Default", "Extensions", identifier),
-			"firefox" : f""
-		},
-		"linux" : {
-			"chromium": os.path.join(user, ".config", "google-chrome", "Default", "Extensions", identifier),
-			"firefox" : f""
-		}
-	}
-	extension = directory_get_chromium_extension(context[system][browser]) if browser == "chromium" else directory_get_firefox_extension(context[system][browser], identifier)
+	parts = EXTENSION_PATHS[(platform.system().lower(), browser)]
+	if browser == "chromium":
+		extension = directory_get_chromium_extension(os.path.join(os.path.expanduser("~"), *parts, identifier))
+	else:
+		extension = directory_get_firefox_extension(os.path.join(os.path.expanduser("~"), *parts) if parts else "", identifier)
 	if not extension:
 		print_error("Browser extension was not found, please pass it manually using the \"-e\" option")
 	return extension
@@ -207,6 +288,72 @@ def get_extra_value(numeric = False, **kwargs):
 
 # ----------------------------------------
 
+GATE_SCRIPT = """(selectors) => Object.fromEntries(Object.entries(selectors).map(([name, [css, text]]) => [name, Array.from(document.querySelectorAll(css)).some((element) => {
+	const normalize = (value) => value.replace(/\\s+/g, " ").trim().toLowerCase();
+	const style = window.getComputedStyle(element);
+	const rect = element.getBoundingClientRect();
+	return rect.width > 0 && rect.height > 0 && style.visibility !== "hidden" && normalize(element.textContent).includes(normalize(text));
+})]))""" # similar to "is_visible()" with "filter(has_text = text)", but for multiple elements at once | does not pierce shadow DOM, ignores "display: contents" and "visibility: collapse", fails if the page navigates meanwhile
+
+WEBHOOK_EMAIL_REGEX = re.compile(r".+@emailhook\.site", re.IGNORECASE)
+
+WEBHOOK_DNS_REGEX = re.compile(r".+\.dnshook\.site", re.IGNORECASE)
+
+# ----------------------------------------
+
+ACCESS_CONTROL_PAGES = [
+	"/home.html"
+]
+ACCESS_CONTROL_FRAGMENTS = [
+	"#new-account",
+	"#new-account/connect",
+	"#notifications",
+	"#restore-vault",
+	"#seed",
+	"#send",
+	"#settings",
+	"#settings/about-us",
+	"#settings/advanced",
+	"#settings/alerts",
+	"#settings/contact-list",
+	"#settings/contact-list/add-contact",
+	"#settings/contact-list/edit-contact",
+	"#settings/contact-list/view-contact",
+	"#settings/general",
+	"#settings/networks",
+	"#settings/networks/form",
+	"#settings/security",
+	"#snaps",
+	"#snaps/view",
+	"#swaps",
+	"#swaps/awaiting-signatures",
+	"#swaps/build-quote",
+	"#swaps/loading-quotes",
+	"#swaps/maintenance",
+	"#swaps/notification-page",
+	"#swaps/prepare-swap-page",
+	"#swaps/smart-transaction-status",
+	"#swaps/swaps-error",
+	"#swaps/view-quote"
+]
+
+def get_access_control_paths(pages, fragments):
+	paths = []
+	for page in pages:
+		page = page.split(".html", 1)[0].strip("/")
+		if page:
+			page = f"/{page}.html"
+			paths.append(page)
+			for fragment in fragments:
+				fragment = fragment.rsplit("#", 1)[-1].strip("/")
+				if fragment:
+					paths.append(f"{page}#{fragment}")
+	return tuple(unique(paths))
+
+ACCESS_CONTROL_PATHS = get_access_control_paths(ACCESS_CONTROL_PAGES, ACCESS_CONTROL_FRAGMENTS) # built once at import, change the pages and fragments as necessary
+
+# ----------------------------------------
+
 class Sandbox:
 
 	def __init__(self, browser, session, extension, password, wait, dev, proxy):
@@ -217,6 +364,8 @@ class Sandbox:
 		self.proxy      = proxy
 		self.playwright = None
 		self.context    = None
+		self.manifest   = None
+		self.cookies    = {} # short-lived cookie cache per url
 		self.timeout    = 30 * 1000 # default timeout for all browser actions
 		self.user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36" # change the user agent as necessary
 		self.settings   = {
@@ -224,6 +373,7 @@ class Sandbox:
 			"password"    : password, # browser extension setup and unlock password
 			"wait_time"   : wait, # default wait time
 			"wait_state"  : "load",
+			"concurrency" : 5, # maximum number of pages to open at once
 			"css_root"    : "body",
 			"css_submit"  : "input[type=submit]",
 			"css_checkbox": "input[type=checkbox]",
@@ -234,6 +384,7 @@ class Sandbox:
 			"url_base"    : "", # browser extension base url | reserved
 			"url_dapp"    : "https://app.uniswap.org" if not self.dev else "https://app.uniswap.org" # use "self.dev" throughout the code to switch between environments
 		} # change the default variables as necessary
+		self.downloads  = os.fspath(self.settings["downloads"])
 
 	async def browser_start(self):
 		self.playwright = await async_playwright().start()
@@ -260,17 +411,24 @@ class Sandbox:
 				"media.navigator.permission.disabled": True # for KYC purposes
 			}
 		)
-		if self.browser != "firefox":
-			await self.context.grant_permissions(["camera"]) # for KYC purposes
 		self.context.set_default_timeout(self.timeout)
+		tasks = [self.__get_url()] # wait for the browser extension while granting the permissions
+		if self.browser != "firefox":
+			tasks.append(self.context.grant_permissions(["camera"])) # for KYC purposes
 		# --------------------------------
-		array = (await self.__get_url()).split("://", 1)
+		array = (await asyncio.gather(*tasks))[0].split("://", 1)
 		self.settings["url_base"] = f"{array[0]}://{array[1].split('/', 1)[0]}"
 		# --------------------------------
 		print_info(f"Running a {self.browser} sandbox...")
 
+	def __load_manifest(self):
+		if self.manifest is None:
+			with open(os.path.join(self.extension, "manifest.json"), "rb", buffering = READ_BUFFER_SIZE) as stream:
+				self.manifest = json.loads(stream.read()) # parse once, "json.loads()" also accepts bytes
+		return self.manifest
+
 	async def __get_url(self):
-		manifest_version = json.loads(open(os.path.join(self.extension, "manifest.json"), "r", encoding = "UTF-8").read())["manifest_version"]
+		manifest_version = self.__load_manifest()["manifest_version"]
 		if manifest_version >= 3:
 			return (await self.context.wait_for_event("serviceworker") if not self.context.service_workers else self.context.service_workers[0]).url
 		else:
@@ -289,16 +447,24 @@ class Sandbox:
 		if close:
 			await page.close()
 
-	async def __wait(self, page, override = -1):
+	async def __wait(self, page, override = -1, navigation = False):
+		self.cookies.clear() # the page might have changed the cookies
 		if override > 0:
 			await asyncio.sleep(override) # override the default wait time
 		elif self.settings["wait_time"] > 0:
-			await asyncio.sleep(self.settings["wait_time"]) # default wait time
+			if navigation: # a new document was loaded, stop waiting once its network goes idle
+				try:
+					await page.wait_for_load_state("networkidle", timeout = self.settings["wait_time"] * 1000) # default wait time is now the upper bound
+				except PlaywrightTimeoutError:
+					pass
+			else: # in-page actions do not load a new document, so there is no network activity to wait for
+				await asyncio.sleep(self.settings["wait_time"]) # default wait time
 		await page.wait_for_load_state(self.settings["wait_state"])
 
 	async def __goto(self, page, url):
+		navigation = page.url.split("#", 1)[0] != url.split("#", 1)[0] # a fragment change does not load a new document
 		response = await page.goto(url)
-		await self.__wait(page) # web pages usually need some time to fully load
+		await self.__wait(page, navigation = navigation) # web pages usually need some time to fully load
 		return response
 
 	async def __goto_browser_extension(self, page, path = ""):
@@ -307,7 +473,7 @@ class Sandbox:
 		return await self.__goto(page, f"{self.settings['url_base']}/{path.lstrip('/')}")
 
 	async def __save_file(self, download):
-		filename = self.settings["downloads"] + os.path.sep + download.suggested_filename
+		filename = os.path.join(self.downloads, download.suggested_filename)
 		await download.save_as(filename)
 		print_download(f"Downloaded file was saved at \"{filename}\"")
 
@@ -334,6 +500,14 @@ class Sandbox:
 	async def __is_visible(self, page, css, text = ""):
 		return await self.__locate(page, css, text).is_visible()
 
+	async def __gate(self, page, selectors): # check the visibility of multiple elements in a single round trip | pass a dictionary of "name: (css, text)"
+		try:
+			return await page.evaluate(GATE_SCRIPT, {name: [css, text] for name, (css, text) in selectors.items()})
+		except PlaywrightTargetClosedError:
+			raise
+		except PlaywrightError: # e.g., execution context was destroyed by a navigation, check one by one
+			return {name: await self.__is_visible(page, css, text) for name, (css, text) in selectors.items()}
+
 	async def __fill(self, page, value, css = ""):
 		if not css:
 			css = self.settings["css_text"]
@@ -387,10 +561,17 @@ class Sandbox:
 		await self.__fill_sequentially(page, value)
 		await self.__submit(page, css, text)
 
+	async def __get_cookies(self, url = None, ttl = 0.25): # reuse the cookies fetched within the last "ttl" seconds
+		now = time.monotonic()
+		key = tuple(url) if isinstance(url, list) else url # you can also pass a list of urls
+		if key not in self.cookies or now - self.cookies[key][0] >= ttl:
+			self.cookies[key] = (now, await self.context.cookies(url))
+		return self.cookies[key][1]
+
 	async def __get_cookie(self, name, url = None): # get a [session] cookie
 		cookie = ""
 		name = name.lower()
-		for entry in await self.context.cookies(url):
+		for entry in await self.__get_cookies(url):
 			if entry["name"].lower() == name:
 				cookie = entry["value"]
 				break
@@ -402,13 +583,14 @@ class Sandbox:
 		page = await self.__new_page()
 		await self.__goto(page, "https://webhook.site")
 		# --------------------------------
-		self.__accept_popups(page, True)
-		await self.__submit(page, "a[id=optionsDropdown]", "more")
-		await self.__submit(page, "a", "delete all requests") # delete all previous collaborator requests and emails
+		if not await page.get_by_text("waiting for first request").first.is_visible(): # skip on an empty webhook
+			self.__accept_popups(page, True)
+			await self.__submit(page, "a[id=optionsDropdown]", "more")
+			await self.__submit(page, "a", "delete all requests") # delete all previous collaborator requests and emails
 		# --------------------------------
-		email = await self.__get_text(page, "code", re.compile(r".+@emailhook\.site", re.IGNORECASE))
+		email = await self.__get_text(page, "code", WEBHOOK_EMAIL_REGEX)
 		print_alert(f"Webhook email: {email}")
-		dns = (await self.__get_text(page, "code", re.compile(r".+\.dnshook\.site", re.IGNORECASE))).lstrip("*.")
+		dns = (await self.__get_text(page, "code", WEBHOOK_DNS_REGEX)).lstrip("*.")
 		print_alert(f"Webhook DNS: {dns}")
 		# --------------------------------
 		return page, email, dns
@@ -420,32 +602,42 @@ class Sandbox:
 
 	# ------------------------------------ METAMASK FLOWS
 
-	async def __created(self, page):
-		return not await self.__is_visible(page, "button", "create a new wallet")
+	async def __get_wallet(self, page): # check if the wallet is created and locked in a single round trip
+		gates = await self.__gate(page, {
+			"create": ("button", "create a new wallet"),
+			"unlock": ("button", "unlock")
+		})
+		return {
+			"created": not gates["create"],
+			"locked" : gates["unlock"]
+		}
+
+	async def __created(self, page, wallet = None):
+		return wallet["created"] if wallet else not await self.__is_visible(page, "button", "create a new wallet")
 
-	async def __is_created(self, page):
-		created = await self.__created(page)
+	async def __is_created(self, page, wallet = None):
+		created = await self.__created(page, wallet)
 		if not created:
 			print_error("Wallet is not created")
 		return created
 
-	async def __is_not_created(self, page):
-		created = await self.__created(page)
+	async def __is_not_created(self, page, wallet = None):
+		created = await self.__created(page, wallet)
 		if created:
 			print_error("Wallet is already created")
 		return not created
 
-	async def __locked(self, page):
-		return await self.__is_visible(page, "button", "unlock")
+	async def __locked(self, page, wallet = None):
+		return wallet["locked"] if wallet else await self.__is_visible(page, "button", "unlock")
 
-	async def __unlock(self, page, password = ""):
-		if await self.__locked(page):
+	async def __unlock(self, page, password = "", wallet = None):
+		if await self.__locked(page, wallet):
 			await self.__fill_password_submit(page, password, "button", "unlock")
 			if await self.__is_visible(page, "button[data-testid=popover-close]"): # close a pop-up
 				await self.__submit(page, "button[data-testid=popover-close]")
 
-	async def __lock(self, page):
-		if not await self.__locked(page):
+	async def __lock(self, page, wallet = None):
+		if not await self.__locked(page, wallet):
 			await self.__goto_browser_extension(page, f"{self.settings['home_page']}#lock")
 
 	# ------------------------------------
@@ -496,34 +688,37 @@ class Sandbox:
 	async def unlock(self, **kwargs):
 		page = await self.__new_page()
 		await self.__goto_browser_extension(page)
-		if await self.__is_created(page):
+		wallet = await self.__get_wallet(page)
+		if await self.__is_created(page, wallet):
 			password = get_extra_value(**kwargs) # pass a [wrong] password as an extra value
-			await self.__unlock(page, password)
+			await self.__unlock(page, password, wallet)
 		# await self.__close(page)
 
 	async def unlock_brute_force(self, **kwargs):
 		page = await self.__new_page()
 		await self.__goto_browser_extension(page)
-		if await self.__is_created(page):
-			await self.__lock(page)
+		wallet = await self.__get_wallet(page)
+		if await self.__is_created(page, wallet):
+			await self.__lock(page, wallet)
 			wordlist = get_extra_value(**kwargs) # pass a wordlist as an extra value
 			if not wordlist:
 				print_error("Wordlist is required, please pass it manually using the \"-v\" option")
 			else:
-				wordlist = read_array(wordlist)
-				print_info(f"Number of words loaded: {len(wordlist)}")
-				for password in wordlist:
+				count = 0
+				for count, password in enumerate(read_generator(wordlist), 1): # stop reading the wordlist on success
 					await self.__fill_password_submit(page, password, "button", "unlock")
 					if not await self.__locked(page):
 						print_alert(f"Unlocked: {password}")
 						break
+				print_info(f"Number of words tried: {count}")
 		# await self.__close(page)
 
 	async def idle_lock(self, **kwargs):
 		page = await self.__new_page()
 		await self.__goto_browser_extension(page)
-		if await self.__is_created(page):
-			await self.__unlock(page)
+		wallet = await self.__get_wallet(page)
+		if await self.__is_created(page, wallet):
+			await self.__unlock(page, wallet = wallet)
 			await self.__submit(page, "button[data-testid=account-options-menu-button]")
 			await self.__submit(page, "button[data-testid=global-menu-settings]")
 			await self.__submit(page, "button", "advanced")
@@ -537,82 +732,51 @@ class Sandbox:
 				print_alert("Auto-lock does not work properly")
 		# await self.__close(page)
 
+	async def __access_control_probe(self, semaphore, path, state): # leave the page open on success
+		async with semaphore:
+			tmp = await self.__new_page()
+			await self.__goto_browser_extension(tmp, path)
+			gates = await self.__gate(tmp, {
+				"content": ("div[id=app-content]", ""),
+				"unlock" : ("button", "unlock"),
+				"balance": ("div[class=wallet-overview__balance]", "")
+			})
+			size = await self.__get_size(tmp, "div[id=app-content]") if gates["content"] else 0
+			if size < 1 or (state == "locked" and gates["unlock"]) or (state == "unlocked" and gates["balance"]):
+				size = 0
+				await self.__close(tmp)
+			return size
+
 	async def access_control(self, **kwargs):
 		page = await self.__new_page()
 		await self.__goto_browser_extension(page)
-		if await self.__is_created(page):
+		wallet = await self.__get_wallet(page)
+		if await self.__is_created(page, wallet):
 			state = get_extra_value(**kwargs).lower() # pass a lock state as an extra value
 			if state == "locked":
-				await self.__lock(page)
+				await self.__lock(page, wallet)
 			elif state == "unlocked":
-				await self.__unlock(page)
+				await self.__unlock(page, wallet = wallet)
 			else:
 				print_error("Lock state is required, please pass \"locked\" or \"unlocked\" manually using the \"-v\" option")
 				return 0
 			# ----------------------------
-			pages = [
-				"/home.html"
-			]
-			fragments = [
-				"#new-account",
-				"#new-account/connect",
-				"#notifications",
-				"#restore-vault",
-				"#seed",
-				"#send",
-				"#settings",
-				"#settings/about-us",
-				"#settings/advanced",
-				"#settings/alerts",
-				"#settings/contact-list",
-				"#settings/contact-list/add-contact",
-				"#settings/contact-list/edit-contact",
-				"#settings/contact-list/view-contact",
-				"#settings/general",
-				"#settings/networks",
-				"#settings/networks/form",
-				"#settings/security",
-				"#snaps",
-				"#snaps/view",
-				"#swaps",
-				"#swaps/awaiting-signatures",
-				"#swaps/build-quote",
-				"#swaps/loading-quotes",
-				"#swaps/maintenance",
-				"#swaps/notification-page",
-				"#swaps/prepare-swap-page",
-				"#swaps/smart-transaction-status",
-				"#swaps/swaps-error",
-				"#swaps/view-quote"
-			]
-			# ----------------------------
-			paths = []
-			for page in pages:
-				page = page.split(".html", 1)[0].strip("/")
-				if page:
-					page = f"/{page}.html"
-					paths.append(page)
-					for fragment in fragments:
-						fragment = fragment.rsplit("#", 1)[-1].strip("/")
-						if fragment:
-							paths.append(f"{page}#{fragment}")
-			paths = unique(paths)
+			paths = ACCESS_CONTROL_PATHS
 			print_info(f"State: {state}")
 			print_info(f"Number of URLs: {len(paths)}")
 			# ----------------------------
-			success = True
-			for path in paths: # reusing the same page on success "False"
-				if success:
-					tmp = await self.__new_page()
-				success = False
-				await self.__goto_browser_extension(tmp, path)
-				size = await self.__get_size(tmp, "div[id=app-content]") if await self.__is_visible(tmp, "div[id=app-content]") else 0
-				if size < 1 or (state == "locked" and await self.__locked(tmp)) or (state == "unlocked" and await self.__is_visible(tmp, "div[class=wallet-overview__balance]")):
-					continue
-				success = True
-				print_alert(f"Size: [{size:>5}] | URL: {self.settings['url_base']}{path}")
-			if not success:
-				await self.__close(tmp)
+			semaphore = asyncio.Semaphore(self.settings["concurrency"])
+			tasks = [asyncio.create_task(self.__access_control_probe(semaphore, path, state)) for path in paths]
+			try:
+				results = await asyncio.gather(*tasks)
+			except BaseException: # stop the other probes before the browser gets closed
+				for task in tasks:
+					task.cancel()
+				await asyncio.gather(*tasks, return_exceptions = True)
+				raise
+			for path, size in zip(paths, results):
+				if size > 0:
+					print_alert(f"Size: [{size:>5}] | URL: {self.settings['url_base']}{path}")
 			# ----------------------------
 		# await self.__close(page)
 
@@ -620,10 +784,9 @@ class Sandbox:
 
 class Test:
 
-	def __init__(self, browser, session, extension, identifier, password, test, value, wait, dev, proxy):
+	def __init__(self, browser, session, extension, identifier, password, tests, value, wait, dev, proxy):
 		session, extension = self.__get_environment(browser, session, extension, identifier)
 		self.event_loop    = self.__get_runtime()
-		self.test          = test
 		self.value         = value
 		self.sandbox       = Sandbox(
 			browser   = browser,
@@ -634,6 +797,11 @@ class Test:
 			dev       = dev,
 			proxy     = proxy
 		)
+		self.flows         = [getattr(self.sandbox, test, None) for test in tests] # resolve the flows once, before the browser starts
+		for test, flow in zip(tests, self.flows):
+			if not callable(flow):
+				print_error(f"Test \"{test}\" does not exist")
+				exit()
 
 	def __get_environment(self, browser, session, extension, identifier, destination = "browser_extension"):
 		success = True
@@ -674,14 +842,16 @@ class Test:
 		return session, destination
 
 	def __get_runtime(self):
-		asyncio.set_event_loop(asyncio.new_event_loop())
-		return asyncio.get_event_loop()
+		event_loop = new_event_loop()
+		asyncio.set_event_loop(event_loop)
+		return event_loop
 
 	def run(self):
 		try:
 			print_info("Press CTRL + C to exit early")
 			self.event_loop.run_until_complete(self.sandbox.browser_start())
-			self.event_loop.run_until_complete(getattr(self.sandbox, self.test)(value = self.value))
+			for flow in self.flows: # all tests share the same browser context
+				self.event_loop.run_until_complete(flow(value = self.value))
 			print_action("Done, press any key to exit...")
 		except (PlaywrightTargetClosedError, PlaywrightTimeoutError, PlaywrightError, KeyboardInterrupt) as ex:
 			print(ex)
@@ -699,7 +869,8 @@ class MyParser(argparse.ArgumentParser):
 		self.browsers   = ["chromium"] # playwright does not actually support firefox extensions
 		self.identifier = "nkbihfbeogaeaoehlefnkodbefgpgknn" # for auto-locating the browser extension
 		self.password   = "Password123!" # browser extension setup and unlock password
-		self.tests      = ["open", "create", "existing", "unlock", "brute_force_unlock", "idle_lock", "access_control"] # to run new tests, add the flows (method names) inside this array
+		self.tests      = ["open", "create", "existing", "unlock", "unlock_brute_force", "idle_lock", "access_control"] # to run new tests, add the flows (method names) inside this array
+		self.values     = ["existing", "unlock", "unlock_brute_force", "access_control"] # tests that take an extra value
 		self.wait       = 2 # default wait time
 
 	def error(self, message):
@@ -736,9 +907,11 @@ class MyParser(argparse.ArgumentParser):
 		print("TEST")
 		print("    Test to run")
 		print(f"    Default: {self.tests[0]}")
-		print(f"    -t, --test = {(' | ').join(self.tests)}")
+		print("    Multiple tests can be separated by a comma and will run in the same browser")
+		print(f"    -t, --test = {(' | ').join(self.tests)} | open,unlock | etc.")
 		print("VALUE")
 		print("    Pass an extra value to a specific test")
+		print("    Only one of the tests to run can take an extra value")
 		print("    Tests:")
 		print("        existing:           pass a mnemonic")
 		print("        unlock:             pass a [wrong] password")
@@ -766,12 +939,18 @@ if __name__ == "__main__":
 	parser.add_argument("-e", "--extension" , required = False, type   = str         , default = ""                                           )
 	parser.add_argument("-i", "--identifier", required = False, type   = str         , default = parser.identifier                            )
 	parser.add_argument("-p", "--password"  , required = False, type   = str         , default = parser.password                              )
-	parser.add_argument("-t", "--test"      , required = False, type   = str         , default = parser.tests[0]   , choices = parser.tests   )
+	parser.add_argument("-t", "--test"      , required = False, type   = str         , default = parser.tests[0]                              )
 	parser.add_argument("-v", "--value"     , required = False, type   = str         , default = ""                                           )
 	parser.add_argument("-w", "--wait"      , required = False, type   = int         , default = parser.wait                                  )
 	parser.add_argument("-d", "--dev"       , required = False, action = "store_true", default = False                                        )
 	parser.add_argument("-x", "--proxy"     , required = False, type   = str         , default = ""                                           )
 	args = parser.parse_args()
+	tests = unique(test.strip() for test in args.test.split(",") if test.strip())
+	for test in tests:
+		if test not in parser.tests:
+			parser.error(f"argument -t/--test: invalid choice: '{test}' (choose from {(', ').join(parser.tests)})")
+	if args.value and len([test for test in tests if test in parser.values]) > 1: # the same value would be passed to every test
+		parser.error(f"argument -v/--value: only one of the tests to run can take an extra value (tests: {(', ').join(parser.values)})")
 	# ------------------------------------
 	test = Test(
 		browser    = args.browser,
@@ -779,7 +958,7 @@ if __name__ == "__main__":
 		extension  = args.extension,
 		identifier = args.identifier,
 		password   = args.password,
-		test       = args.test,
+		tests      = tests,
 		value      = args.value,
 		wait       = args.wait,
 		dev        = args.dev,
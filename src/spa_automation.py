@@ -1,9 +1,18 @@
 #!/usr/bin/env python3
 
-import argparse, asyncio, os, re, tempfile
+import argparse, asyncio, os, platform, re, shutil, tempfile, time
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from playwright._impl._errors import TargetClosedError as PlaywrightTargetClosedError, Error as PlaywrightError
 
+def new_event_loop(): # use uvloop if installed, optional, faster event loop
+	if platform.system().lower() != "windows":
+		try:
+			import uvloop
+			return uvloop.new_event_loop()
+		except ImportError:
+			pass
+	return asyncio.new_event_loop()
+
 # ----------------------------------------
 
 def print_info(text):
@@ -24,12 +33,13 @@ def print_error(text):
 # ----------------------------------------
 
 def unique(sequence, sort = False): # unique sort
-	seen = set()
-	array = [x for x in sequence if not (x in seen or seen.add(x))]
+	array = list(dict.fromkeys(sequence)) # preserves the insertion order
 	if sort and array:
-		array = sorted(array, key = str.casefold, reverse = False) # sort by name ascending
+		array.sort(key = str.casefold, reverse = False) # sort by name ascending
 	return array
 
+READ_BUFFER_SIZE = 1024 * 1024 # 1 MiB, fewer "read()" calls for large files such as wordlists
+
 def read_array(file, sort = False):
 	array = []
 	if not os.path.isfile(file):
@@ -39,12 +49,11 @@ def read_array(file, sort = False):
 	elif not os.stat(file).st_size > 0:
 		print_error(f"\"{file}\" file is empty")
 	else:
-		with open(file, "r", encoding = "UTF-8") as stream:
-			for line in stream:
-				line = line.strip()
-				if line:
-					array.append(line)
-	return unique(array, sort)
+		with open(file, "r", encoding = "UTF-8", buffering = READ_BUFFER_SIZE) as stream:
+			array = list(dict.fromkeys(line for line in (line.strip() for line in stream) if line)) # unique in a single pass
+		if sort and array:
+			array.sort(key = str.casefold, reverse = False) # sort by name ascending
+	return array
 
 def directory_create(directory):
 	success = True
@@ -59,6 +68,16 @@ def directory_create(directory):
 def directory_create_tmp():
 	return tempfile.mkdtemp(prefix = "spa_automation_", suffix = "_session", dir = os.getcwd()) # create a new random directory in the current working directory and return its absolute path
 
+def directory_clone_tmp(directory): # copy a user session directory to a new random directory in the system's temporary directory and return its absolute path | empty on failure
+	destination = tempfile.mkdtemp(prefix = "spa_automation_", suffix = "_worker")
+	try:
+		shutil.copytree(directory, destination, symlinks = True, ignore = shutil.ignore_patterns("Singleton*"), dirs_exist_ok = True) # skip the browser's profile locks
+	except Exception: # e.g., files locked by a running browser on Windows
+		print_error(f"Cannot copy \"{directory}\" directory to \"{destination}\" directory")
+		shutil.rmtree(destination, ignore_errors = True)
+		destination = ""
+	return destination
+
 # ----------------------------------------
 
 def get_extra_value(numeric = False, **kwargs):
@@ -66,24 +85,89 @@ def get_extra_value(numeric = False, **kwargs):
 	if numeric:
 		if not value:
 			value = -1
-		elif not value.isdigit():
-			value = -1
-			print_error("Extra value must be a numeric greater than or equal to zero")
 		else:
-			value = int(value)
+			try:
+				value = int(value)
+				if value < 0:
+					raise ValueError()
+			except (TypeError, ValueError):
+				value = -1
+				print_error("Extra value must be a numeric greater than or equal to zero")
 	return value
 
 # ----------------------------------------
 
+WEBHOOK_EMAIL_REGEX = re.compile(r".+@emailhook\.site", re.IGNORECASE)
+
+WEBHOOK_DNS_REGEX = re.compile(r".+\.dnshook\.site", re.IGNORECASE)
+
+# ----------------------------------------
+
+ACCESS_CONTROL_PAGES = [
+	"/home.html"
+]
+ACCESS_CONTROL_FRAGMENTS = [
+	"#new-account",
+	"#new-account/connect",
+	"#notifications",
+	"#restore-vault",
+	"#seed",
+	"#send",
+	"#settings",
+	"#settings/about-us",
+	"#settings/advanced",
+	"#settings/alerts",
+	"#settings/contact-list",
+	"#settings/contact-list/add-contact",
+	"#settings/contact-list/edit-contact",
+	"#settings/contact-list/view-contact",
+	"#settings/general",
+	"#settings/networks",
+	"#settings/networks/form",
+	"#settings/security",
+	"#snaps",
+	"#snaps/view",
+	"#swaps",
+	"#swaps/awaiting-signatures",
+	"#swaps/build-quote",
+	"#swaps/loading-quotes",
+	"#swaps/maintenance",
+	"#swaps/notification-page",
+	"#swaps/prepare-swap-page",
+	"#swaps/smart-transaction-status",
+	"#swaps/swaps-error",
+	"#swaps/view-quote"
+]
+
+def normalize_page(page): # "/home.html" | empty on failure
+	page = page.split(".html", 1)[0].strip("/")
+	return f"/{page}.html" if page else ""
+
+def normalize_fragment(fragment): # "settings/about-us" | empty on failure
+	return fragment.rsplit("#", 1)[-1].strip("/")
+
+def get_access_control_paths(pages, fragments):
+	pages = [page for page in map(normalize_page, pages) if page]
+	fragments = [fragment for fragment in map(normalize_fragment, fragments) if fragment]
+	return tuple(unique(path for page in pages for path in [page] + [f"{page}#{fragment}" for fragment in fragments]))
+
+ACCESS_CONTROL_PATHS = get_access_control_paths(ACCESS_CONTROL_PAGES, ACCESS_CONTROL_FRAGMENTS) # built once at import, change the pages and fragments as necessary
+
+# ----------------------------------------
+
 class Sandbox:
 
 	def __init__(self, browser, session, password, wait, dev, proxy):
+		if browser not in ["chromium", "firefox"]:
+			print_error(f"Browser \"{browser}\" is not supported")
+			exit()
 		self.browser    = browser
 		self.session    = os.path.abspath(session)
 		self.dev        = dev
 		self.proxy      = proxy
 		self.playwright = None
 		self.context    = None
+		self.cookies    = {} # short-lived cookie cache per url
 		self.timeout    = 30 * 1000 # default timeout for all browser actions
 		self.user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36" # change the user agent as necessary
 		self.settings   = {
@@ -91,6 +175,8 @@ class Sandbox:
 			"password"    : password, # SPA setup and unlock password
 			"wait_time"   : wait, # default wait time
 			"wait_state"  : "load",
+			"concurrency" : 5, # maximum number of pages to open at once
+			"workers"     : 1, # number of browsers for brute forcing, each additional browser runs on a copy of the user session
 			"css_root"    : "body",
 			"css_submit"  : "input[type=submit]",
 			"css_checkbox": "input[type=checkbox]",
@@ -101,14 +187,30 @@ class Sandbox:
 			"url_base"    : "https://wallet.uniswap.org", # SPA base url | specify
 			"url_dapp"    : "https://app.uniswap.org" if not self.dev else "https://app.uniswap.org" # use "self.dev" throughout the code to switch between environments
 		} # change the default variables as necessary
+		self.__load_settings()
+
+	def __load_settings(self): # frequently used settings as attributes, call again after changing the settings
+		self.password     = self.settings["password"]
+		self.wait_time    = self.settings["wait_time"]
+		self.wait_state   = self.settings["wait_state"]
+		self.css_submit   = self.settings["css_submit"]
+		self.css_checkbox = self.settings["css_checkbox"]
+		self.css_text     = self.settings["css_text"]
+		self.css_email    = self.settings["css_email"]
+		self.css_password = self.settings["css_password"]
+		self.home_page    = self.settings["home_page"]
+		self.url_base     = self.settings["url_base"]
+		self.downloads    = self.settings["downloads"]
 
 	async def browser_start(self):
+		self.__load_settings()
 		self.playwright = await async_playwright().start()
-		browsers = {
-			"chromium": self.playwright.chromium,
-			"firefox" : self.playwright.firefox
-		}
-		self.context = await browsers[self.browser].launch_persistent_context(
+		self.context = await self.__launch(self.session)
+		# --------------------------------
+		print_info(f"Running a {self.browser} sandbox...")
+
+	async def __launch(self, session):
+		context = await getattr(self.playwright, self.browser).launch_persistent_context(
 			headless            = False,
 			handle_sigint       = False, # do not terminate on SIGINT (CTRL + C)
 			bypass_csp          = False,
@@ -117,7 +219,7 @@ class Sandbox:
 			accept_downloads    = True,
 			proxy               = { "server": self.proxy } if self.proxy else None,
 			user_agent          = self.user_agent,
-			user_data_dir       = self.session,
+			user_data_dir       = session,
 			downloads_path      = self.settings["downloads"],
 			args                = [],
 			firefox_user_prefs  = {
@@ -125,10 +227,23 @@ class Sandbox:
 			}
 		)
 		if self.browser != "firefox":
-			await self.context.grant_permissions(["camera"]) # for KYC purposes
-		self.context.set_default_timeout(self.timeout)
-		# --------------------------------
-		print_info(f"Running a {self.browser} sandbox...")
+			await context.grant_permissions(["camera"]) # for KYC purposes
+		context.set_default_timeout(self.timeout)
+		return context
+
+	async def __clone_session(self, count): # close the browser so the user session is not in use while being copied, then reopen it
+		sessions = []
+		if count > 0:
+			await self.context.close()
+			try:
+				for i in range(count):
+					session = directory_clone_tmp(self.session)
+					if not session:
+						break
+					sessions.append(session)
+			finally:
+				self.context = await self.__launch(self.session)
+		return sessions
 
 	async def browser_stop(self):
 		await self.context.close()
@@ -143,25 +258,41 @@ class Sandbox:
 		if close:
 			await page.close()
 
-	async def __wait(self, page, override = -1):
+	async def __wait(self, page, override = -1, wait_state = "", navigation = False):
+		if not wait_state:
+			wait_state = self.wait_state
+		self.cookies.clear() # the page might have changed the cookies
 		if override > 0:
 			await asyncio.sleep(override) # override the default wait time
-		elif self.settings["wait_time"] > 0:
-			await asyncio.sleep(self.settings["wait_time"]) # default wait time
-		await page.wait_for_load_state(self.settings["wait_state"])
-
-	async def __goto(self, page, url):
-		response = await page.goto(url)
-		await self.__wait(page) # web pages usually need some time to fully load
+		elif self.wait_time > 0:
+			if navigation: # a new document was loaded, stop waiting once its network goes idle
+				try:
+					await page.wait_for_load_state("networkidle", timeout = self.wait_time * 1000) # default wait time is now the upper bound
+				except PlaywrightTimeoutError:
+					pass
+			else: # in-page actions and history API navigations do not load a new document, so there is no network activity to wait for
+				await asyncio.sleep(self.wait_time) # default wait time
+		await page.wait_for_load_state(wait_state)
+
+	async def __goto(self, page, url, wait = True, wait_state = ""): # pass "domcontentloaded" as "wait_state" to skip waiting for all the subresources
+		if not wait_state:
+			wait_state = self.wait_state
+		self.cookies.clear() # the page might change the cookies
+		navigation = page.url.split("#", 1)[0] != url.split("#", 1)[0] # a fragment change does not load a new document
+		response = await page.goto(url, wait_until = "domcontentloaded")
+		if wait:
+			await self.__wait(page, wait_state = wait_state, navigation = navigation) # web pages usually need some time to fully load
+		else: # skip the default wait time, but still wait for the load state
+			await page.wait_for_load_state(wait_state)
 		return response
 
-	async def __goto_spa(self, page, path = ""):
+	async def __goto_spa(self, page, path = "", wait = True, wait_state = ""):
 		if not path:
-			path = self.settings["home_page"]
-		return await self.__goto(page, f"{self.settings['url_base']}/{path.lstrip('/')}")
+			path = self.home_page
+		return await self.__goto(page, f"{self.url_base}/{path.lstrip('/')}", wait, wait_state)
 
 	async def __save_file(self, download):
-		filename = self.settings["downloads"] + os.path.sep + download.suggested_filename
+		filename = os.path.join(self.downloads, download.suggested_filename)
 		await download.save_as(filename)
 		print_download(f"Downloaded file was saved at \"{filename}\"")
 
@@ -190,47 +321,61 @@ class Sandbox:
 
 	async def __fill(self, page, value, css = ""):
 		if not css:
-			css = self.settings["css_text"]
+			css = self.css_text
 		await self.__locate(page, css).fill(value)
 
 	async def __fill_sequentially(self, page, value, css = ""):
 		if not css:
-			css = self.settings["css_text"]
+			css = self.css_text
 		for i in range(len(value)):
 			await self.__locate(page, f"{css}>>nth={i}").press_sequentially(value[i])
 
 	async def __tick(self, page, css = ""):
 		if not css:
-			css = self.settings["css_checkbox"]
+			css = self.css_checkbox
 		await self.__locate(page, css).click()
 
 	async def __submit(self, page, css = "", text = ""):
 		if not css:
-			css = self.settings["css_submit"]
+			css = self.css_submit
 		await self.__locate(page, css, text).click()
 		await self.__wait(page) # web forms usually need some time to be processed
 
+	async def __submit_nav(self, page, css = "", text = ""): # for clicks that navigate, including the history API, the default wait time is the upper bound if no navigation happens
+		if not css:
+			css = self.css_submit
+		clicked = False
+		try:
+			async with page.expect_navigation(wait_until = "domcontentloaded", timeout = max(self.wait_time, 1) * 1000):
+				await self.__locate(page, css, text).click()
+				clicked = True
+			await self.__wait(page)
+		except PlaywrightTimeoutError:
+			if not clicked: # only the navigation is allowed to time out
+				raise
+			self.cookies.clear() # no navigation, e.g. a wrong password, the default wait time has already passed
+
 	# ------------------------------------ GENERIC BUILDING BLOCKS (MULTIPLE ACTIONS)
 
 	async def __create_password_submit(self, page, password = "", css = "", text = ""): # fill in twice
 		if not password:
-			password = self.settings["password"]
+			password = self.password
 		for i in range(2):
-			await self.__fill(page, password, f"{self.settings['css_password']}>>nth={i}")
+			await self.__fill(page, password, f"{self.css_password}>>nth={i}")
 		await self.__submit(page, css, text)
 
 	async def __fill_password_submit(self, page, password = "", css = "", text = ""): # fill in once
 		if not password:
-			password = self.settings["password"]
-		await self.__fill(page, password, self.settings["css_password"])
+			password = self.password
+		await self.__fill(page, password, self.css_password)
 		await self.__submit(page, css, text)
 
 	async def __fill_sequentially_password_submit(self, page, password, css = "", text = ""): # fill in a mnemonic where each word has a separate input field | pass an array as "password"
-		await self.__fill_sequentially(page, password, self.settings["css_password"])
+		await self.__fill_sequentially(page, password, self.css_password)
 		await self.__submit(page, css, text)
 
 	async def __fill_email_submit(self, page, email, css = "", text = ""):
-		await self.__fill(page, email, self.settings["css_email"])
+		await self.__fill(page, email, self.css_email)
 		await self.__submit(page, css, text)
 
 	async def __fill_text_submit(self, page, value, css = "", text = ""):
@@ -241,14 +386,18 @@ class Sandbox:
 		await self.__fill_sequentially(page, value)
 		await self.__submit(page, css, text)
 
+	async def __get_cookies(self, url = None, ttl = 1): # reuse the cookies fetched within the last "ttl" seconds | cookie names are lowercased
+		now = time.monotonic()
+		key = tuple(url) if isinstance(url, list) else url # you can also pass a list of urls
+		if key not in self.cookies or now - self.cookies[key][0] >= ttl:
+			cookies = {}
+			for entry in await self.context.cookies(url):
+				cookies.setdefault(entry["name"].lower(), entry["value"]) # keep the first match
+			self.cookies[key] = (now, cookies)
+		return self.cookies[key][1]
+
 	async def __get_cookie(self, name, url = None): # get a [session] cookie
-		cookie = ""
-		name = name.lower()
-		for entry in await self.context.cookies(url):
-			if entry["name"].lower() == name:
-				cookie = entry["value"]
-				break
-		return cookie
+		return (await self.__get_cookies(url)).get(name.lower(), "")
 	
 	# ------------------------------------ WEBHOOK BUILDING BLOCKS
 
@@ -260,9 +409,9 @@ class Sandbox:
 		await self.__submit(page, "a[id=optionsDropdown]", "more")
 		await self.__submit(page, "a", "delete all requests") # delete all previous collaborator requests and emails
 		# --------------------------------
-		email = await self.__get_text(page, "code", re.compile(r".+@emailhook\.site", re.IGNORECASE))
+		email = await self.__get_text(page, "code", WEBHOOK_EMAIL_REGEX)
 		print_alert(f"Webhook email: {email}")
-		dns = (await self.__get_text(page, "code", re.compile(r".+\.dnshook\.site", re.IGNORECASE))).lstrip("*.")
+		dns = (await self.__get_text(page, "code", WEBHOOK_DNS_REGEX)).lstrip("*.")
 		print_alert(f"Webhook DNS: {dns}")
 		# --------------------------------
 		return page, email, dns
@@ -294,13 +443,14 @@ class Sandbox:
 
 	async def __unlock(self, page, password = ""):
 		if await self.__locked(page):
-			await self.__fill_password_submit(page, password, "button", "unlock")
+			await self.__fill(page, password or self.password, self.css_password)
+			await self.__submit_nav(page, "button", "unlock")
 			if await self.__is_visible(page, "button[data-testid=popover-close]"): # close a pop-up
 				await self.__submit(page, "button[data-testid=popover-close]")
 
 	async def __lock(self, page):
 		if not await self.__locked(page):
-			await self.__goto_spa(page, f"{self.settings['home_page']}#lock")
+			await self.__goto_spa(page, f"{self.home_page}#lock")
 
 	# ------------------------------------
 
@@ -366,21 +516,54 @@ class Sandbox:
 			else:
 				wordlist = read_array(wordlist)
 				print_info(f"Number of words loaded: {len(wordlist)}")
+				sessions = await self.__clone_session(min(self.settings["workers"], len(wordlist)) - 1) # one copy per additional worker
+				if sessions: # the browser was reopened
+					page = await self.__new_page()
+					await self.__goto_spa(page)
+					await self.__lock(page)
+				queue = asyncio.Queue()
 				for password in wordlist:
-					await self.__fill_password_submit(page, password, "button", "unlock")
-					if not await self.__locked(page):
-						print_alert(f"Unlocked: {password}")
-						break
+					queue.put_nowait(password)
+				found = asyncio.Event()
+				tasks = [asyncio.create_task(self.__unlock_brute_force_worker(page, queue, found))]
+				contexts = []
+				try:
+					for session in sessions:
+						context = await self.__launch(session)
+						contexts.append(context)
+						tmp = await context.new_page()
+						await self.__goto_spa(tmp)
+						await self.__lock(tmp)
+						tasks.append(asyncio.create_task(self.__unlock_brute_force_worker(tmp, queue, found)))
+					await asyncio.gather(*tasks)
+				except BaseException: # stop the other workers before their browsers get closed
+					for task in tasks:
+						task.cancel()
+					await asyncio.gather(*tasks, return_exceptions = True)
+					raise
+				finally:
+					for context in contexts:
+						await context.close()
+					for session in sessions:
+						shutil.rmtree(session, ignore_errors = True)
 		# await self.__close(page)
 
+	async def __unlock_brute_force_worker(self, page, queue, found): # try the passwords until the queue is empty or any worker succeeds
+		while not found.is_set() and not queue.empty():
+			password = queue.get_nowait()
+			await self.__fill_password_submit(page, password, "button", "unlock")
+			if not await self.__locked(page):
+				found.set()
+				print_alert(f"Unlocked: {password}")
+
 	async def idle_lock(self, **kwargs):
 		page = await self.__new_page()
 		await self.__goto_spa(page)
 		if await self.__is_created(page):
 			await self.__unlock(page)
 			await self.__submit(page, "button[data-testid=account-options-menu-button]")
-			await self.__submit(page, "button[data-testid=global-menu-settings]")
-			await self.__submit(page, "button", "advanced")
+			await self.__submit_nav(page, "button[data-testid=global-menu-settings]")
+			await self.__submit_nav(page, "button", "advanced")
 			await self.__fill(page, "2", "input[id=autoTimeout]") # 2 minutes
 			await self.__submit(page, "button[data-testid=auto-lockout-button]")
 			wait_time = 2 * 60 + 5 # 2 minutes and 5 seconds
@@ -391,6 +574,16 @@ class Sandbox:
 				print_alert("Auto-lock does not work properly")
 		# await self.__close(page)
 
+	async def __access_control_probe(self, semaphore, path, state): # leave the page open on success
+		async with semaphore:
+			tmp = await self.__new_page() # a fresh page per probe, a hash-only navigation on a reused page would return before the route changes
+			await self.__goto_spa(tmp, path, wait_state = "domcontentloaded")
+			size = await self.__get_size(tmp, "div[id=app-content]") if await self.__is_visible(tmp, "div[id=app-content]") else 0
+			if size < 1 or (state == "locked" and await self.__locked(tmp)) or (state == "unlocked" and await self.__is_visible(tmp, "div[class=wallet-overview__balance]")):
+				size = 0
+				await self.__close(tmp)
+			return size
+
 	async def access_control(self, **kwargs):
 		page = await self.__new_page()
 		await self.__goto_spa(page)
@@ -404,69 +597,22 @@ class Sandbox:
 				print_error("Lock state is required, please pass \"locked\" or \"unlocked\" manually using the \"-v\" option")
 				return 0
 			# ----------------------------
-			pages = [
-				"/home.html"
-			]
-			fragments = [
-				"#new-account",
-				"#new-account/connect",
-				"#notifications",
-				"#restore-vault",
-				"#seed",
-				"#send",
-				"#settings",
-				"#settings/about-us",
-				"#settings/advanced",
-				"#settings/alerts",
-				"#settings/contact-list",
-				"#settings/contact-list/add-contact",
-				"#settings/contact-list/edit-contact",
-				"#settings/contact-list/view-contact",
-				"#settings/general",
-				"#settings/networks",
-				"#settings/networks/form",
-				"#settings/security",
-				"#snaps",
-				"#snaps/view",
-				"#swaps",
-				"#swaps/awaiting-signatures",
-				"#swaps/build-quote",
-				"#swaps/loading-quotes",
-				"#swaps/maintenance",
-				"#swaps/notification-page",
-				"#swaps/prepare-swap-page",
-				"#swaps/smart-transaction-status",
-				"#swaps/swaps-error",
-				"#swaps/view-quote"
-			]
-			# ----------------------------
-			paths = []
-			for page in pages:
-				page = page.split(".html", 1)[0].strip("/")
-				if page:
-					page = f"/{page}.html"
-					paths.append(page)
-					for fragment in fragments:
-						fragment = fragment.rsplit("#", 1)[-1].strip("/")
-						if fragment:
-							paths.append(f"{page}#{fragment}")
-			paths = unique(paths)
+			paths = ACCESS_CONTROL_PATHS
 			print_info(f"State: {state}")
 			print_info(f"Number of URLs: {len(paths)}")
 			# ----------------------------
-			success = True
-			for path in paths: # reusing the same page on success "False"
-				if success:
-					tmp = await self.__new_page()
-				success = False
-				await self.__goto_spa(tmp, path)
-				size = await self.__get_size(tmp, "div[id=app-content]") if await self.__is_visible(tmp, "div[id=app-content]") else 0
-				if size < 1 or (state == "locked" and await self.__locked(tmp)) or (state == "unlocked" and await self.__is_visible(tmp, "div[class=wallet-overview__balance]")):
-					continue
-				success = True
-				print_alert(f"Size: [{size:>5}] | URL: {self.settings['url_base']}{path}")
-			if not success:
-				await self.__close(tmp)
+			semaphore = asyncio.Semaphore(self.settings["concurrency"])
+			tasks = [asyncio.create_task(self.__access_control_probe(semaphore, path, state)) for path in paths]
+			try:
+				results = await asyncio.gather(*tasks)
+			except BaseException: # stop the other probes before the browser gets closed
+				for task in tasks:
+					task.cancel()
+				await asyncio.gather(*tasks, return_exceptions = True)
+				raise
+			for path, size in zip(paths, results):
+				if size > 0:
+					print_alert(f"Size: [{size:>5}] | URL: {self.url_base}{path}")
 			# ----------------------------
 		# await self.__close(page)
 
@@ -476,7 +622,6 @@ class Test:
 
 	def __init__(self, browser, session, password, test, value, wait, dev, proxy):
 		session            = self.__get_environment(session)
-		self.event_loop    = self.__get_runtime()
 		self.test          = test
 		self.value         = value
 		self.sandbox       = Sandbox(
@@ -487,6 +632,10 @@ class Test:
 			dev      = dev,
 			proxy    = proxy
 		)
+		self.flow          = getattr(self.sandbox, test, None) # resolve the flow once
+		if not callable(self.flow):
+			print_error(f"Test \"{test}\" does not exist")
+			exit()
 
 	def __get_environment(self, session):
 		if not session:
@@ -497,22 +646,19 @@ class Test:
 			exit()
 		return session
 
-	def __get_runtime(self):
-		asyncio.set_event_loop(asyncio.new_event_loop())
-		return asyncio.get_event_loop()
-
 	def run(self):
+		event_loop = new_event_loop() # the prompt below runs outside of the event loop
 		try:
 			print_info("Press CTRL + C to exit early")
-			self.event_loop.run_until_complete(self.sandbox.browser_start())
-			self.event_loop.run_until_complete(getattr(self.sandbox, self.test)(value = self.value))
+			event_loop.run_until_complete(self.sandbox.browser_start())
+			event_loop.run_until_complete(self.flow(value = self.value))
 			print_action("Done, press any key to exit...")
 		except (PlaywrightTargetClosedError, PlaywrightTimeoutError, PlaywrightError, KeyboardInterrupt) as ex:
 			print(ex)
 		finally:
-			self.event_loop.run_until_complete(self.sandbox.browser_stop())
-			self.event_loop.stop()
-			self.event_loop.close()
+			event_loop.run_until_complete(self.sandbox.browser_stop())
+			event_loop.run_until_complete(event_loop.shutdown_asyncgens())
+			event_loop.close()
 
 # ----------------------------------------
 
@@ -522,7 +668,7 @@ class MyParser(argparse.ArgumentParser):
 		super(MyParser, self).__init__(*args, **kwargs)
 		self.browsers   = ["chromium", "firefox"]
 		self.password   = "Password123!" # browser extension setup and unlock password
-		self.tests      = ["open", "create", "existing", "unlock", "brute_force_unlock", "idle_lock", "access_control"] # to run new tests, add the flows (method names) inside this array
+		self.tests      = ["open", "create", "existing", "unlock", "unlock_brute_force", "idle_lock", "access_control"] # to run new tests, add the flows (method names) inside this array
 		self.wait       = 2 # default wait time
 
 	def error(self, message):